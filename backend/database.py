@@ -1,13 +1,15 @@
 import pandas as pd
-import json
+import io
 import logging
-from typing import Optional, List, Union
-from datetime import datetime, timedelta
-import pytz
+from typing import Optional, List, Union, Iterator
+from datetime import datetime, timedelta, timezone
 import os
 from pathlib import Path
-from events_api import get_events as get_events_api, extract_venue_info, extract_classifications
+import orjson
+import psycopg2.extras
+from events_api import iter_event_pages
 from sqlalchemy import create_engine, text
+from sqlalchemy.sql.elements import TextClause
 
 # Configure logging
 logging.basicConfig(
@@ -16,6 +18,286 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Decode JSON/JSONB columns (price_ranges, images, venue_location) with orjson instead of stdlib json
+psycopg2.extras.register_default_json(globally=True, loads=orjson.loads)
+psycopg2.extras.register_default_jsonb(globally=True, loads=orjson.loads)
+
+
+# Tables created by SCHEMA_SQL
+KNOWN_TABLES = ('events', 'users', 'user_events', 'city_loads')
+
+# Columns written by _upsert_events, in COPY order
+UPSERT_COLUMNS = (
+    'id', 'name', 'url', 'date', 'time', 'datetime', 'timezone', 'status',
+    'venue_id', 'venue_name', 'venue_address', 'venue_city', 'venue_state',
+    'venue_country', 'venue_postal_code', 'venue_timezone', 'venue_location',
+    'classification_segment', 'classification_genre', 'classification_subgenre',
+    'classification_type', 'classification_subtype', 'classification_family',
+    'price_ranges', 'images', 'info', 'please_note',
+    'price_min', 'price_max', 'price_currency', 'venue_lat', 'venue_lng'
+)
+
+
+# Statements used by _upsert_events: COPY the batch into a temporary table, then merge it into events
+UPSERT_COLUMN_LIST = ', '.join(UPSERT_COLUMNS)
+STAGING_CREATE_SQL = "CREATE TEMP TABLE events_staging (LIKE events INCLUDING DEFAULTS) ON COMMIT DROP"
+STAGING_COPY_SQL = f"COPY events_staging ({UPSERT_COLUMN_LIST}) FROM STDIN WITH (FORMAT CSV, NULL '\\N')"
+# DISTINCT ON keeps one row per id, ON CONFLICT cannot touch the same row twice
+STAGING_MERGE_SQL = f"""
+    INSERT INTO events ({UPSERT_COLUMN_LIST})
+    SELECT DISTINCT ON (id) {UPSERT_COLUMN_LIST} FROM events_staging
+    ON CONFLICT (id) DO UPDATE SET
+        name = EXCLUDED.name,
+        url = EXCLUDED.url,
+        date = EXCLUDED.date,
+        time = EXCLUDED.time,
+        datetime = EXCLUDED.datetime,
+        status = EXCLUDED.status,
+        venue_name = EXCLUDED.venue_name,
+        venue_city = EXCLUDED.venue_city,
+        venue_location = EXCLUDED.venue_location,
+        price_ranges = EXCLUDED.price_ranges,
+        price_min = EXCLUDED.price_min,
+        price_max = EXCLUDED.price_max,
+        price_currency = EXCLUDED.price_currency,
+        venue_lat = EXCLUDED.venue_lat,
+        venue_lng = EXCLUDED.venue_lng,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+# Last successful load of a configured city compared against a max age in minutes; keyed on the
+# config name because radius searches return venues labelled "Praha 1", suburbs, etc.
+CITY_FRESHNESS_SQL = text("""
+    SELECT loaded_at > LOCALTIMESTAMP - make_interval(mins => :max_age)
+    FROM city_loads
+    WHERE city = :city
+""")
+# Record a successful load of a configured city
+CITY_LOADED_SQL = text("""
+    INSERT INTO city_loads (city, loaded_at) VALUES (:city, CURRENT_TIMESTAMP)
+    ON CONFLICT (city) DO UPDATE SET loaded_at = EXCLUDED.loaded_at
+""")
+
+# Ticketmaster event fields (json_normalize paths) mapped to events columns
+EVENT_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'url': 'url',
+    'dates.start.localDate': 'date',
+    'dates.start.localTime': 'time',
+    'dates.start.dateTime': 'datetime',
+    'dates.timezone': 'timezone',
+    'dates.status.code': 'status',
+    'priceRanges': 'price_ranges',
+    'images': 'images',
+    'info': 'info',
+    'pleaseNote': 'please_note'
+}
+# Fields of the first embedded venue / classification / price range mapped to events columns
+VENUE_FIELDS = {
+    'id': 'venue_id',
+    'name': 'venue_name',
+    'address.line1': 'venue_address',
+    'city.name': 'venue_city',
+    'state.name': 'venue_state',
+    'country.name': 'venue_country',
+    'postalCode': 'venue_postal_code',
+    'timezone': 'venue_timezone',
+    'location.latitude': 'venue_lat',
+    'location.longitude': 'venue_lng'
+}
+CLASSIFICATION_FIELDS = {
+    'segment.name': 'classification_segment',
+    'genre.name': 'classification_genre',
+    'subGenre.name': 'classification_subgenre',
+    'type.name': 'classification_type',
+    'subType.name': 'classification_subtype',
+    'family': 'classification_family'
+}
+PRICE_FIELDS = {
+    'min': 'price_min',
+    'max': 'price_max',
+    'currency': 'price_currency'
+}
+
+
+# Schema script run by _init_database, sent to the server in a single round trip
+SCHEMA_SQL = """
+-- Create events table schema if it doesn't exist
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    url TEXT,
+    date DATE,
+    time TIME,
+    datetime TIMESTAMP WITH TIME ZONE,
+    timezone TEXT,
+    status TEXT,
+    venue_id TEXT,
+    venue_name TEXT,
+    venue_address TEXT,
+    venue_city TEXT,
+    venue_state TEXT,
+    venue_country TEXT,
+    venue_postal_code TEXT,
+    venue_timezone TEXT,
+    venue_location JSONB,
+    classification_segment TEXT,
+    classification_genre TEXT,
+    classification_subgenre TEXT,
+    classification_type TEXT,
+    classification_subtype TEXT,
+    classification_family BOOLEAN DEFAULT FALSE,
+    price_ranges JSONB,
+    images JSONB,
+    info TEXT,
+    please_note TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Flat copies of the first price range and the venue coordinates (the JSONB columns keep the raw data)
+ALTER TABLE events ADD COLUMN IF NOT EXISTS price_min NUMERIC;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS price_max NUMERIC;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS price_currency TEXT;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS venue_lat DOUBLE PRECISION;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS venue_lng DOUBLE PRECISION;
+
+-- Last successful Ticketmaster load per configured city (drives the reload freshness check)
+CREATE TABLE IF NOT EXISTS city_loads (
+    city TEXT PRIMARY KEY,
+    loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create users table if it doesn't exist
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    telegram_id TEXT UNIQUE,
+    username TEXT,
+    first_name TEXT,
+    last_name TEXT,
+    preferences JSONB,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create user_events table for user-event relationships
+CREATE TABLE IF NOT EXISTS user_events (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES users(id),
+    event_id TEXT REFERENCES events(id),
+    status TEXT DEFAULT 'interested',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(user_id, event_id)
+);
+
+-- Create indexes for better performance
+-- (date, time) serves both the date range filter and ORDER BY date, time
+DROP INDEX IF EXISTS idx_events_date;
+CREATE INDEX IF NOT EXISTS idx_events_date_time ON events(date, time);
+-- Composite expression indexes matching the case-insensitive /api/events filters plus the date range;
+-- (city, date, time) also returns a city's events already in ORDER BY date, time order
+DROP INDEX IF EXISTS idx_events_city;
+DROP INDEX IF EXISTS idx_events_classification;
+DROP INDEX IF EXISTS idx_events_city_lower;
+DROP INDEX IF EXISTS idx_events_segment_lower;
+CREATE INDEX IF NOT EXISTS idx_events_city_date ON events(LOWER(venue_city), date, time);
+CREATE INDEX IF NOT EXISTS idx_events_segment_date ON events(LOWER(classification_segment), date);
+CREATE INDEX IF NOT EXISTS idx_users_telegram_id ON users(telegram_id);
+
+-- Create trigger for updated_at
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS update_events_updated_at ON events;
+
+CREATE TRIGGER update_events_updated_at
+    BEFORE UPDATE ON events
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+"""
+
+
+def to_api_datetime(dt: datetime) -> str:
+    """Format a UTC datetime the way the Ticketmaster API expects (YYYY-MM-DDTHH:MM:SSZ)."""
+    return dt.isoformat(timespec='seconds').replace('+00:00', 'Z')
+
+
+def first_items(df: pd.DataFrame, column: str) -> List[dict]:
+    """First element of each list in a list-valued column, {} where the list is missing or empty."""
+    if column not in df.columns:
+        return [{}] * len(df)
+    return [items[0] if isinstance(items, list) and items and isinstance(items[0], dict) else {} for items in df[column]]
+
+
+def normalize_fields(records: List[dict], fields: dict, index: pd.Index) -> pd.DataFrame:
+    """Flatten records with json_normalize and keep the mapped fields under their column names."""
+    df = pd.json_normalize(records, sep='.', max_level=1).reindex(columns=list(fields)).rename(columns=fields)
+    df.index = index
+    return df
+
+
+def to_json_text(value):
+    """Encode dicts and lists as JSON text for JSONB columns; other values pass through."""
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value).decode()
+    return value
+
+
+def build_events_frame(events_data: List[dict]) -> pd.DataFrame:
+    """Flatten a page of Ticketmaster events into a DataFrame with the events table columns."""
+    # Flatten the nested event documents in one pass; list fields (venues,
+    # classifications, priceRanges, images) are kept as-is in their cells
+    raw_df = pd.json_normalize(events_data, sep='.', max_level=3)
+    events_df = raw_df.reindex(columns=list(EVENT_FIELDS)).rename(columns=EVENT_FIELDS)
+    events_df['price_ranges'] = events_df['price_ranges'].map(lambda x: x if isinstance(x, list) else [])
+    events_df['images'] = events_df['images'].map(lambda x: x if isinstance(x, list) else [])
+    
+    # Venue and classification columns come from the first embedded venue / classification
+    venues = first_items(raw_df, '_embedded.venues')
+    classifications = first_items(raw_df, 'classifications')
+    venue_df = normalize_fields(venues, VENUE_FIELDS, events_df.index)
+    venue_df['venue_location'] = [venue.get('location') or {} for venue in venues]
+    classification_df = normalize_fields(classifications, CLASSIFICATION_FIELDS, events_df.index)
+    
+    events_df = pd.concat([events_df, venue_df, classification_df], axis=1)
+    
+    # Plain columns for the first price range and the venue coordinates (sent as strings by the API)
+    price_df = normalize_fields(first_items(events_df, 'price_ranges'), PRICE_FIELDS, events_df.index)
+    events_df['price_min'] = pd.to_numeric(price_df['price_min'], errors='coerce')
+    events_df['price_max'] = pd.to_numeric(price_df['price_max'], errors='coerce')
+    events_df['price_currency'] = price_df['price_currency']
+    events_df['venue_lat'] = pd.to_numeric(events_df['venue_lat'], errors='coerce')
+    events_df['venue_lng'] = pd.to_numeric(events_df['venue_lng'], errors='coerce')
+    events_df['classification_family'] = events_df['classification_family'].eq(True)
+    events_df = events_df.reindex(columns=list(UPSERT_COLUMNS))
+    
+    return events_df
+
+
+def insert_execute_values(table, conn, keys, data_iter):
+    """
+    DataFrame.to_sql insertion method sending rows with psycopg2's execute_values.
+    
+    Rows go out as multi-row VALUES pages of 1000, instead of one oversized
+    statement (method='multi') or one statement per row (the default).
+    """
+    table_name = f"{table.schema}.{table.name}" if table.schema else table.name
+    columns = ', '.join(f'"{key}"' for key in keys)
+    with conn.connection.cursor() as cur:
+        psycopg2.extras.execute_values(
+            cur,
+            f"INSERT INTO {table_name} ({columns}) VALUES %s",
+            list(data_iter),
+            page_size=1000
+        )
+
+
 class PostgreSQLDatabaseAPI:
     """
     Database API for Railway PostgreSQL with all the same functionality as SQLite version.
@@ -35,108 +317,50 @@ class PostgreSQLDatabaseAPI:
             database_url = database_url.replace('postgres://', 'postgresql://', 1)
         
         self.database_url = database_url
-        self.engine = create_engine(database_url)
+        # Pool sized for gunicorn's threads per worker; pre-ping and recycle replace
+        # connections Railway has closed while idle instead of failing the next query.
+        # LIFO checkout keeps reusing the most recently returned (warm) connections.
+        self.engine = create_engine(
+            database_url,
+            pool_size=10,
+            max_overflow=10,
+            pool_pre_ping=True,
+            pool_recycle=1800,
+            pool_use_lifo=True,
+            executemany_mode='values_plus_batch'
+        )
         self._init_database()
         logger.info("✅ PostgreSQL database initialized successfully")
     
     def _init_database(self):
         """Initialize database and create essential tables if they don't exist."""
         try:
-            with self.engine.connect() as conn:
-                # Create events table schema if it doesn't exist
-                conn.execute(text("""
-                    CREATE TABLE IF NOT EXISTS events (
-                        id TEXT PRIMARY KEY,
-                        name TEXT NOT NULL,
-                        url TEXT,
-                        date DATE,
-                        time TIME,
-                        datetime TIMESTAMP WITH TIME ZONE,
-                        timezone TEXT,
-                        status TEXT,
-                        venue_id TEXT,
-                        venue_name TEXT,
-                        venue_address TEXT,
-                        venue_city TEXT,
-                        venue_state TEXT,
-                        venue_country TEXT,
-                        venue_postal_code TEXT,
-                        venue_timezone TEXT,
-                        venue_location JSONB,
-                        classification_segment TEXT,
-                        classification_genre TEXT,
-                        classification_subgenre TEXT,
-                        classification_type TEXT,
-                        classification_subtype TEXT,
-                        classification_family BOOLEAN DEFAULT FALSE,
-                        price_ranges JSONB,
-                        images JSONB,
-                        info TEXT,
-                        please_note TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """))
-                
-                # Create users table if it doesn't exist
-                conn.execute(text("""
-                    CREATE TABLE IF NOT EXISTS users (
-                        id SERIAL PRIMARY KEY,
-                        telegram_id TEXT UNIQUE,
-                        username TEXT,
-                        first_name TEXT,
-                        last_name TEXT,
-                        preferences JSONB,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """))
-                
-                # Create user_events table for user-event relationships
-                conn.execute(text("""
-                    CREATE TABLE IF NOT EXISTS user_events (
-                        id SERIAL PRIMARY KEY,
-                        user_id INTEGER REFERENCES users(id),
-                        event_id TEXT REFERENCES events(id),
-                        status TEXT DEFAULT 'interested',
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        UNIQUE(user_id, event_id)
-                    )
-                """))
-                
-                # Create indexes for better performance
-                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_events_date ON events(date)"))
-                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_events_city ON events(venue_city)"))
-                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_events_classification ON events(classification_segment)"))
-                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_users_telegram_id ON users(telegram_id)"))
-                
-                # Create trigger for updated_at
-                conn.execute(text("""
-                    CREATE OR REPLACE FUNCTION update_updated_at_column()
-                    RETURNS TRIGGER AS $$
-                    BEGIN
-                        NEW.updated_at = CURRENT_TIMESTAMP;
-                        RETURN NEW;
-                    END;
-                    $$ language 'plpgsql'
-                """))
-                
-                conn.execute(text("""
-                    DROP TRIGGER IF EXISTS update_events_updated_at ON events;"""))
-                
-                conn.execute(text("""
-                    CREATE TRIGGER update_events_updated_at
-                        BEFORE UPDATE ON events
-                        FOR EACH ROW
-                        EXECUTE FUNCTION update_updated_at_column()
-                """))
-                
-                conn.commit()
+            # One transaction and one round trip for the whole schema script
+            with self.engine.begin() as conn:
+                conn.exec_driver_sql(SCHEMA_SQL)
                 logger.info("📊 PostgreSQL schema initialized successfully")
                 
         except Exception as e:
             logger.error(f"❌ Database initialization error: {e}")
             raise
+        
+        self._init_keyword_index()
+    
+    def _init_keyword_index(self):
+        """
+        Create a trigram index so the keyword filter (name ILIKE '%...%') can use an index.
+        
+        Optional: the pg_trgm extension may be unavailable or need extra privileges,
+        in which case keyword search keeps working with a sequential scan.
+        """
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_events_name_trgm ON events USING gin (name gin_trgm_ops)"))
+                conn.commit()
+                
+        except Exception as e:
+            logger.warning(f"⚠️ Keyword search index not created: {e}")
     
     def save_table(self, table_name: str, data: pd.DataFrame) -> bool:
         """
@@ -155,21 +379,12 @@ class PostgreSQLDatabaseAPI:
                 logger.warning(f"⚠️ DataFrame is empty for table '{table_name}'")
                 return False
             
-            # Special handling for events table with proper JSON serialization
+            # Events are merged through the staging table so existing ids are updated, not duplicated
             if table_name == 'events':
-                # Convert complex fields to JSON strings for PostgreSQL JSONB
-                if 'venue_location' in data.columns:
-                    data['venue_location'] = data['venue_location'].apply(
-                        lambda x: json.dumps(x) if isinstance(x, dict) else x
-                    )
-                if 'price_ranges' in data.columns:
-                    data['price_ranges'] = data['price_ranges'].apply(
-                        lambda x: json.dumps(x) if isinstance(x, list) else x
-                    )
-                if 'images' in data.columns:
-                    data['images'] = data['images'].apply(
-                        lambda x: json.dumps(x) if isinstance(x, list) else x
-                    )
+                if not self._upsert_events(data):
+                    return False
+                logger.info(f"✅ Successfully saved {len(data)} records to table '{table_name}'")
+                return True
             
             # Use pandas to_sql with PostgreSQL engine
             data.to_sql(
@@ -177,33 +392,9 @@ class PostgreSQLDatabaseAPI:
                 self.engine, 
                 if_exists='append', 
                 index=False,
-                method='multi'  # Faster batch inserts
+                method=insert_execute_values  # Batched VALUES pages via psycopg2
             )
             
-            # Handle conflicts for events table specifically
-            if table_name == 'events':
-                with self.engine.connect() as conn:
-                    # Use ON CONFLICT for upsert behavior
-                    conn.execute(text(f"""
-                        INSERT INTO {table_name} 
-                        SELECT * FROM {table_name}_temp
-                        ON CONFLICT (id) DO UPDATE SET
-                            name = EXCLUDED.name,
-                            url = EXCLUDED.url,
-                            date = EXCLUDED.date,
-                            time = EXCLUDED.time,
-                            datetime = EXCLUDED.datetime,
-                            timezone = EXCLUDED.timezone,
-                            status = EXCLUDED.status,
-                            venue_name = EXCLUDED.venue_name,
-                            venue_city = EXCLUDED.venue_city,
-                            venue_country = EXCLUDED.venue_country,
-                            classification_segment = EXCLUDED.classification_segment,
-                            classification_genre = EXCLUDED.classification_genre,
-                            updated_at = CURRENT_TIMESTAMP
-                    """))
-                    conn.commit()
-            
             logger.info(f"✅ Successfully saved {len(data)} records to table '{table_name}'")
             return True
             
@@ -246,185 +437,140 @@ class PostgreSQLDatabaseAPI:
     
     def load_prg_data(
         self,
+        city: str = "Prague",
+        country_code: str = "CZ",
+        lat_long: str = "50.0755,14.4378",
+        radius: int = 25,
+        days_ahead: int = 90,
+        max_age_minutes: int = 60,
+        max_pages: int = 5
     ) -> bool:
         """
         Load event data from Ticketmaster API and save to PostgreSQL database.
         
         Args:
-            table_name: Name of the table to save events to
-            city: City to search events in
+            city: City the events are loaded for (used for logging and the freshness check)
             country_code: Country code (e.g., "CZ", "US")
+            lat_long: Search center as "latitude,longitude"
+            radius: Search radius around lat_long
             days_ahead: Number of days ahead to search
-            classification: Event classifications (comma-separated)
-            size: Maximum number of events to fetch
-            keyword: Optional keyword to search for
+            max_age_minutes: Skip the API call if the city's events were updated more recently than this
+            max_pages: Maximum number of 200-event API pages to load
             
         Returns:
-            bool: True if data loaded successfully, False otherwise
+            bool: True if data loaded successfully (or is still fresh), False otherwise
         """
         try:
-            logger.info(f"🎫 Loading event data for Prague, CZ")
+            if self._is_city_fresh(city, max_age_minutes):
+                logger.info(f"⏭️ Events for {city}, {country_code} loaded within the last {max_age_minutes} minutes, skipping reload")
+                return True
             
-            # Calculate date range
-            now = datetime.now(pytz.UTC)
-            future_date = now + timedelta(days=90)
+            logger.info(f"🎫 Loading event data for {city}, {country_code}")
             
-            start_date_time = now.strftime("%Y-%m-%dT%H:%M:%SZ")
-            end_date_time = future_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+            # Calculate date range; the start is floored to the hour so repeated loads send
+            # identical parameters and can be answered from the events_api response cache
+            now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+            future_date = now + timedelta(days=days_ahead)
             
-            # Call Ticketmaster API
-            api_response = get_events_api(
-                lat_long='50.0755,14.4378',  # Prague center coordinates
-                radius=25,  # 25km radius
+            start_date_time = to_api_datetime(now)
+            end_date_time = to_api_datetime(future_date)
+            
+            # Fetch, flatten and upsert one API page at a time, so only a single page is held in memory
+            pages = iter_event_pages(
+                max_pages=max_pages,
+                lat_long=lat_long,
+                radius=radius,
                 start_date_time=start_date_time,
                 end_date_time=end_date_time,
-                size=min(200, 200),
+                size=200,
                 sort="date,asc",
                 include_tba="no",
                 include_tbd="no",
                 save_to_file=False
             )
             
-            # Extract events data
-            events_data = api_response.get('_embedded', {}).get('events', [])
-            
-            if not events_data:
-                logger.warning(f"⚠️ No events found for Prague, CZ")
-                return False
-            
-            logger.info(f"🎭 Processing {len(events_data)} events from Ticketmaster API")
-            
-            # Transform events data (same logic as SQLite version)
-            transformed_events = []
-            for event in events_data:
-                venue_info = extract_venue_info(event)
-                classification_info = extract_classifications(event)
+            total_loaded = 0
+            for page_number, events_data in enumerate(pages, start=1):
+                logger.info(f"🎭 Processing {len(events_data)} events from Ticketmaster API (page {page_number})")
                 
-                transformed_event = {
-                    'id': event.get('id'),
-                    'name': event.get('name'),
-                    'url': event.get('url'),
-                    'date': event.get('dates', {}).get('start', {}).get('localDate'),
-                    'time': event.get('dates', {}).get('start', {}).get('localTime'),
-                    'datetime': event.get('dates', {}).get('start', {}).get('dateTime'),
-                    'timezone': event.get('dates', {}).get('timezone'),
-                    'status': event.get('dates', {}).get('status', {}).get('code'),
-                    'venue_id': venue_info.get('id') if venue_info else None,
-                    'venue_name': venue_info.get('name') if venue_info else None,
-                    'venue_address': venue_info.get('address') if venue_info else None,
-                    'venue_city': venue_info.get('city') if venue_info else None,
-                    'venue_state': venue_info.get('state') if venue_info else None,
-                    'venue_country': venue_info.get('country') if venue_info else None,
-                    'venue_postal_code': venue_info.get('postal_code') if venue_info else None,
-                    'venue_timezone': venue_info.get('timezone') if venue_info else None,
-                    'venue_location': venue_info.get('location', {}) if venue_info else {},
-                    'classification_segment': classification_info.get('segment') if classification_info else None,
-                    'classification_genre': classification_info.get('genre') if classification_info else None,
-                    'classification_subgenre': classification_info.get('subgenre') if classification_info else None,
-                    'classification_type': classification_info.get('type') if classification_info else None,
-                    'classification_subtype': classification_info.get('subtype') if classification_info else None,
-                    'classification_family': classification_info.get('family', False) if classification_info else False,
-                    'price_ranges': event.get('priceRanges', []),
-                    'images': event.get('images', []),
-                    'info': event.get('info'),
-                    'please_note': event.get('pleaseNote')
-                }
-                transformed_events.append(transformed_event)
-            
-            # Convert to DataFrame
-            events_df = pd.DataFrame(transformed_events)
-            
-            # Use PostgreSQL UPSERT for efficient updates
-            success = self._upsert_events(events_df)
+                # Use PostgreSQL UPSERT for efficient updates
+                if not self._upsert_events(build_events_frame(events_data)):
+                    logger.error(f"❌ Failed to save events to PostgreSQL")
+                    return False
+                total_loaded += len(events_data)
             
-            if success:
-                logger.info(f"✅ Successfully loaded {len(events_df)} events to PostgreSQL")
-            else:
-                logger.error(f"❌ Failed to save events to PostgreSQL")
+            if not total_loaded:
+                logger.warning(f"⚠️ No events found for {city}, {country_code}")
+                return False
             
-            return success
+            logger.info(f"✅ Successfully loaded {total_loaded} events to PostgreSQL")
+            self._mark_city_loaded(city)
+            return True
             
         except Exception as e:
             logger.error(f"❌ Error loading event data: {e}")
             return False
     
-    def _upsert_events(self, events_df: pd.DataFrame) -> bool:
-        """Perform efficient UPSERT for events data using PostgreSQL."""
+    def _is_city_fresh(self, city: str, max_age_minutes: int) -> bool:
+        """Check whether the configured city was successfully loaded within the last max_age_minutes."""
+        return bool(self.execute_scalar(CITY_FRESHNESS_SQL, {"city": city.lower(), "max_age": max_age_minutes}))
+    
+    def _mark_city_loaded(self, city: str) -> None:
+        """Record a successful load of the configured city for _is_city_fresh."""
         try:
-            with self.engine.connect() as conn:
-                # Use PostgreSQL's efficient UPSERT
-                for _, event in events_df.iterrows():
-                    conn.execute(text("""
-                        INSERT INTO events (
-                            id, name, url, date, time, datetime, timezone, status,
-                            venue_id, venue_name, venue_address, venue_city, venue_state, 
-                            venue_country, venue_postal_code, venue_timezone, venue_location,
-                            classification_segment, classification_genre, classification_subgenre,
-                            classification_type, classification_subtype, classification_family,
-                            price_ranges, images, info, please_note
-                        ) VALUES (
-                            :id, :name, :url, :date, :time, :datetime, :timezone, :status,
-                            :venue_id, :venue_name, :venue_address, :venue_city, :venue_state,
-                            :venue_country, :venue_postal_code, :venue_timezone, :venue_location,
-                            :classification_segment, :classification_genre, :classification_subgenre,
-                            :classification_type, :classification_subtype, :classification_family,
-                            :price_ranges, :images, :info, :please_note
-                        )
-                        ON CONFLICT (id) DO UPDATE SET
-                            name = EXCLUDED.name,
-                            url = EXCLUDED.url,
-                            date = EXCLUDED.date,
-                            time = EXCLUDED.time,
-                            datetime = EXCLUDED.datetime,
-                            status = EXCLUDED.status,
-                            venue_name = EXCLUDED.venue_name,
-                            venue_city = EXCLUDED.venue_city,
-                            updated_at = CURRENT_TIMESTAMP
-                    """), {
-                        'id': event['id'],
-                        'name': event['name'],
-                        'url': event['url'],
-                        'date': event['date'],
-                        'time': event['time'],
-                        'datetime': event['datetime'],
-                        'timezone': event['timezone'],
-                        'status': event['status'],
-                        'venue_id': event['venue_id'],
-                        'venue_name': event['venue_name'],
-                        'venue_address': event['venue_address'],
-                        'venue_city': event['venue_city'],
-                        'venue_state': event['venue_state'],
-                        'venue_country': event['venue_country'],
-                        'venue_postal_code': event['venue_postal_code'],
-                        'venue_timezone': event['venue_timezone'],
-                        'venue_location': json.dumps(event['venue_location']),
-                        'classification_segment': event['classification_segment'],
-                        'classification_genre': event['classification_genre'],
-                        'classification_subgenre': event['classification_subgenre'],
-                        'classification_type': event['classification_type'],
-                        'classification_subtype': event['classification_subtype'],
-                        'classification_family': event['classification_family'],
-                        'price_ranges': json.dumps(event['price_ranges']),
-                        'images': json.dumps(event['images']),
-                        'info': event['info'],
-                        'please_note': event['please_note']
-                    })
-                
-                conn.commit()
-                return True
+            with self.engine.begin() as conn:
+                conn.execute(CITY_LOADED_SQL, {"city": city.lower()})
                 
         except Exception as e:
+            # The events are already saved; the next load just won't be skipped
+            logger.warning(f"⚠️ Could not record load time for {city}: {e}")
+    
+    def _upsert_events(self, events_df: pd.DataFrame) -> bool:
+        """
+        Perform efficient UPSERT for events data using PostgreSQL.
+        
+        Rows are streamed with COPY into a temporary staging table and merged
+        into events with a single INSERT ... ON CONFLICT, one round trip for the batch.
+        """
+        # Serialize the batch as CSV in UPSERT_COLUMNS order; JSONB columns are encoded to JSON text up front
+        staged_df = events_df.reindex(columns=list(UPSERT_COLUMNS))
+        for column in ('venue_location', 'price_ranges', 'images'):
+            staged_df[column] = list(map(to_json_text, staged_df[column].to_numpy()))
+        buffer = io.StringIO()
+        staged_df.to_csv(buffer, index=False, header=False, na_rep='\\N')
+        buffer.seek(0)
+        
+        raw_conn = self.engine.raw_connection()
+        try:
+            with raw_conn.cursor() as cur:
+                cur.execute(STAGING_CREATE_SQL)
+                cur.copy_expert(STAGING_COPY_SQL, buffer)
+                cur.execute(STAGING_MERGE_SQL)
+            raw_conn.commit()
+            return True
+            
+        except Exception as e:
+            raw_conn.rollback()
             logger.error(f"❌ Error during events upsert: {e}")
             return False
+        
+        finally:
+            raw_conn.close()
     
     def get_table_data(self, table_name: str, limit: Optional[int] = None) -> pd.DataFrame:
         """Get data from a table as pandas DataFrame."""
         try:
+            # Table names cannot be bound, so only known tables are interpolated
+            if table_name not in KNOWN_TABLES:
+                raise ValueError(f"Unknown table '{table_name}'")
+            
             query = f"SELECT * FROM {table_name}"
+            params = None
             if limit:
-                query += f" LIMIT {limit}"
+                query += " LIMIT :limit"
+                params = {"limit": int(limit)}
             
-            df = pd.read_sql_query(query, self.engine)
+            df = pd.read_sql_query(text(query), self.engine, params=params)
             logger.info(f"📊 Retrieved {len(df)} records from table '{table_name}'")
             return df
             
@@ -432,15 +578,23 @@ class PostgreSQLDatabaseAPI:
             logger.error(f"❌ Error getting data from table '{table_name}': {e}")
             return pd.DataFrame()
     
-    def execute_query(self, query: str, params: Optional[dict] = None) -> List[tuple]:
-        """Execute a custom SQL query."""
+    def execute_query(self, query: Union[str, TextClause], params: Optional[dict] = None, as_mappings: bool = False) -> List[tuple]:
+        """
+        Execute a custom SQL query.
+        
+        With as_mappings=True rows are returned as read-only mappings keyed by column name.
+        A prebuilt text() clause is executed as is, which lets SQLAlchemy reuse its compiled form.
+        """
         try:
             with self.engine.connect() as conn:
+                statement = text(query) if isinstance(query, str) else query
                 if params:
-                    result = conn.execute(text(query), params)
+                    result = conn.execute(statement, params)
                 else:
-                    result = conn.execute(text(query))
+                    result = conn.execute(statement)
                 
+                if as_mappings:
+                    result = result.mappings()
                 results = result.fetchall()
                 logger.info(f"🔍 Query executed successfully, returned {len(results)} rows")
                 return results
@@ -448,6 +602,37 @@ class PostgreSQLDatabaseAPI:
         except Exception as e:
             logger.error(f"❌ Error executing query: {e}")
             return []
+    
+    def execute_scalar(self, query: Union[str, TextClause], params: Optional[dict] = None, default=None):
+        """
+        Execute a query returning a single value (e.g. COUNT(*)) and return that value.
+        
+        Skips building a row list; returns default if the query fails or yields no row.
+        """
+        try:
+            with self.engine.connect() as conn:
+                statement = text(query) if isinstance(query, str) else query
+                value = conn.execute(statement, params or {}).scalar()
+                return default if value is None else value
+                
+        except Exception as e:
+            logger.error(f"❌ Error executing query: {e}")
+            return default
+    
+    def iter_query(self, query: Union[str, TextClause], params: Optional[dict] = None, batch_size: int = 1000) -> Iterator[tuple]:
+        """
+        Execute a custom SQL query and yield rows as they arrive.
+        
+        Rows are read through a server-side cursor batch_size at a time, so the raw
+        rows are never collected into a list; whatever the caller builds from them
+        (e.g. the serialized /api/events body) is still held in full. Unlike
+        execute_query, errors are raised to the caller, which may already have
+        consumed part of the result.
+        """
+        with self.engine.connect() as conn:
+            statement = text(query) if isinstance(query, str) else query
+            result = conn.execution_options(yield_per=batch_size).execute(statement, params or {})
+            yield from result
 
 
 # Factory function to create the appropriate database API
@@ -2,48 +2,61 @@ import os
 import sys
 from database import create_database_api
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def populate_events_database():
+# Number of cities loaded concurrently by populate_events_database
+MAX_PARALLEL_CITIES = 3
+
+def populate_events_database(db=None):
     """Populate the database with events from multiple cities."""
     
     try:
-        # Initialize database
-        db = create_database_api()
+        # Initialize database unless the caller already holds one
+        if db is None:
+            db = create_database_api()
         logger.info("🚀 Starting database population...")
         
         # List of cities to populate
         cities_to_populate = [
-            {"city": "Prague", "country": "CZ", "days": 90},
-            {"city": "Berlin", "country": "DE", "days": 60},
-            {"city": "Vienna", "country": "AT", "days": 60},
-            {"city": "Munich", "country": "DE", "days": 45},
-            {"city": "Bratislava", "country": "SK", "days": 45}
+            {"city": "Prague", "country": "CZ", "lat_long": "50.0755,14.4378", "days": 90},
+            {"city": "Berlin", "country": "DE", "lat_long": "52.5200,13.4050", "days": 60},
+            {"city": "Vienna", "country": "AT", "lat_long": "48.2082,16.3738", "days": 60},
+            {"city": "Munich", "country": "DE", "lat_long": "48.1351,11.5820", "days": 45},
+            {"city": "Bratislava", "country": "SK", "lat_long": "48.1486,17.1077", "days": 45}
         ]
         
         total_events_loaded = 0
         
-        for city_config in cities_to_populate:
+        def load_city(city_config):
             logger.info(f"🏙️ Loading events for {city_config['city']}, {city_config['country']}")
+            return db.load_prg_data(
+                city=city_config['city'],
+                country_code=city_config['country'],
+                lat_long=city_config['lat_long'],
+                days_ahead=city_config['days']
+            )
+        
+        # Cities are independent and I/O-bound (HTTP + DB), so load a few at once;
+        # Ticketmaster's per-second rate limit is enforced by the shared limiter in events_api.get_events
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_CITIES) as executor:
+            results = executor.map(load_city, cities_to_populate)
             
-            success = db.load_prg_data()
-            
-            if success:
-                logger.info(f"✅ Successfully loaded events for {city_config['city']}")
-                total_events_loaded += 1
-            else:
-                logger.error(f"❌ Failed to load events for {city_config['city']}")
+            for city_config, success in zip(cities_to_populate, results):
+                if success:
+                    logger.info(f"✅ Successfully loaded events for {city_config['city']}")
+                    total_events_loaded += 1
+                else:
+                    logger.error(f"❌ Failed to load events for {city_config['city']}")
         
         logger.info(f"🎉 Database population completed! Processed {total_events_loaded}/{len(cities_to_populate)} cities")
         
-        # Get final count
-        events_df = db.get_table_data("events", limit=1)
-        if not events_df.empty:
-            total_count = db.execute_query("SELECT COUNT(*) FROM events")
-            if total_count:
-                logger.info(f"📊 Total events in database: {total_count[0][0]}")
+        # Get final count (no need to read a row into a DataFrame first)
+        total_count = db.execute_scalar("SELECT COUNT(*) FROM events", default=0)
+        if total_count:
+            logger.info(f"📊 Total events in database: {total_count}")
         
         return True
         
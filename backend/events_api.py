@@ -1,13 +1,78 @@
 import requests
-import json
-from typing import Optional, List, Dict, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from cachetools import TTLCache
+import orjson
+from typing import Optional, List, Dict, Any, Iterator, Literal
 from datetime import datetime
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+# Read the API key once at import; only fall back to a local .env file when the
+# environment doesn't provide TM or DATABASE_URL (Railway sets both directly).
+# database.py imports this module first, so its DATABASE_URL lookups see the .env values too
+if os.getenv('TM') is None or os.getenv('DATABASE_URL') is None:
+    from dotenv import load_dotenv
+    load_dotenv()
 the_key = os.getenv('TM', None)
 
+# Accepted values of the Discovery API's include* and unit parameters
+IncludeFlag = Literal["yes", "no", "only"]
+DistanceUnit = Literal["miles", "km"]
+
+# Shared session so repeated Ticketmaster calls reuse pooled keep-alive connections;
+# rate-limit (429) and transient server errors are retried with backoff
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+))
+_SESSION.headers.update({"Accept": "application/json", "User-Agent": "events_mini_app/1.0"})
+
+# Parsed get_events responses keyed on the final request parameters
+_RESPONSE_CACHE = TTLCache(maxsize=1024, ttl=300)
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+# Single background thread for save_to_file writes, so get_events doesn't block on disk I/O;
+# pending writes are still flushed when the interpreter exits
+_FILE_WRITER = ThreadPoolExecutor(max_workers=1)
+
+# Concurrent page requests in iter_event_pages; the overall request rate is capped separately below
+PAGE_FETCH_WORKERS = 4
+
+# Ticketmaster allows 5 requests per second; request starts are spaced across all threads
+# (city workers times page workers), so the combined fan-out stays under the limit
+MAX_REQUESTS_PER_SECOND = 5
+_REQUEST_INTERVAL = 1.0 / MAX_REQUESTS_PER_SECOND
+_RATE_LIMIT_LOCK = threading.Lock()
+_next_request_at = 0.0
+
+
+def _wait_for_request_slot() -> None:
+    """Block until this thread may start the next Ticketmaster request"""
+    global _next_request_at
+    
+    with _RATE_LIMIT_LOCK:
+        now = time.monotonic()
+        start_at = max(now, _next_request_at)
+        _next_request_at = start_at + _REQUEST_INTERVAL
+    
+    # Sleep outside the lock so other threads can reserve their own slots
+    if start_at > now:
+        time.sleep(start_at - now)
+
+
+def _write_file(filename: str, payload: bytes) -> None:
+    """Write a saved API response to disk (runs on _FILE_WRITER)"""
+    try:
+        with open(filename, 'wb') as file:
+            file.write(payload)
+    except OSError as e:
+        print(f"Error saving response to {filename}: {e}")
+
 
 def get_events(
     # Basic search parameters
@@ -25,7 +90,7 @@ def get_events(
     lat_long: Optional[str] = None,  # Format: "latitude,longitude"
     geo_point: Optional[str] = None,  # GeoHash
     radius: Optional[int] = None,
-    unit: str = "miles",  # "miles" or "km"
+    unit: DistanceUnit = "miles",  # "miles" or "km"
     
     # Classification filters
     classification_name: Optional[List[str]] = None,  # e.g., ["music", "sports"]
@@ -53,11 +118,11 @@ def get_events(
     
     # Content filters
     source: Optional[str] = None,  # "ticketmaster", "universe", "frontgate", "tmr"
-    include_test: str = "no",  # "yes", "no", "only"
-    include_tba: str = "no",  # Include "To Be Announced" events
-    include_tbd: str = "no",  # Include "To Be Determined" events
-    include_family: str = "yes",  # "yes", "no", "only"
-    include_spellcheck: str = "no",
+    include_test: IncludeFlag = "no",  # "yes", "no", "only"
+    include_tba: IncludeFlag = "no",  # Include "To Be Announced" events
+    include_tbd: IncludeFlag = "no",  # Include "To Be Determined" events
+    include_family: IncludeFlag = "yes",  # "yes", "no", "only"
+    include_spellcheck: Literal["yes", "no"] = "no",
     
     # Pagination and sorting
     size: int = 200,  # Max events per page (max 200)
@@ -172,9 +237,7 @@ def get_events(
     }
     
     # Add non-None optional parameters
-    for key, value in optional_params.items():
-        if value is not None:
-            params[key] = value
+    params.update({key: value for key, value in optional_params.items() if value is not None})
     
     # Handle list parameters
     list_params = {
@@ -187,17 +250,30 @@ def get_events(
         "subTypeId": subtype_id
     }
     
-    for key, value in list_params.items():
-        if value is not None and len(value) > 0:
-            params[key] = value if isinstance(value, list) else [value]
+    # Add non-empty list parameters (requests repeats the key for each value)
+    params.update({key: value for key, value in list_params.items() if value})
+    
+    # Serve identical searches from the response cache; calls with file/print side effects always hit the API
+    use_cache = not (save_to_file or print_response)
+    if use_cache:
+        cache_key = tuple(sorted((key, tuple(value) if isinstance(value, list) else value) for key, value in params.items()))
+        with _RESPONSE_CACHE_LOCK:
+            cached_data = _RESPONSE_CACHE.get(cache_key)
+        if cached_data is not None:
+            return cached_data
     
     try:
-        # Make the API request
-        response = requests.get(base_url, params=params, timeout=30)
+        # Make the API request once a rate limit slot is free
+        _wait_for_request_slot()
+        response = _SESSION.get(base_url, params=params, timeout=30)
         response.raise_for_status()  # Raise an exception for bad status codes
         
         # Parse JSON response
-        data = response.json()
+        data = orjson.loads(response.content)
+        
+        if use_cache:
+            with _RESPONSE_CACHE_LOCK:
+                _RESPONSE_CACHE[cache_key] = data
         
         # Print response if requested
         if print_response:
@@ -212,18 +288,19 @@ def get_events(
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 filename = f"ticketmaster_events_{timestamp}.json"
             
-            with open(filename, 'w', encoding='utf-8') as file:
-                json.dump(data, file, indent=4, ensure_ascii=False)
+            # Serialize now (the caller may modify data afterwards), write to disk in the background
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            _FILE_WRITER.submit(_write_file, filename, payload)
             
             if print_response:
-                print(f"Response saved to: {filename}")
+                print(f"Saving response to: {filename}")
         
         return data
         
     except requests.exceptions.RequestException as e:
         print(f"API Request Error: {e}")
         raise
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         print(f"JSON Decode Error: {e}")
         raise
     except Exception as e:
@@ -231,6 +308,56 @@ def get_events(
         raise
 
 
+def iter_event_pages(max_pages: int = 5, **kwargs) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield the events of each page (up to max_pages) in page order.
+    
+    Page 0 is fetched first to learn totalPages; the remaining pages are then
+    fetched concurrently and yielded as soon as each one (in order) is ready.
+    
+    Args:
+        max_pages: Maximum number of pages to fetch
+        **kwargs: All other parameters from get_events()
+    
+    Yields:
+        List of events on each non-empty page
+    """
+    try:
+        response = get_events(page=0, **kwargs)
+    except Exception as e:
+        print(f"Error fetching page 0: {e}")
+        return
+    
+    events = response.get('_embedded', {}).get('events', [])
+    if not events:  # No events at all
+        return
+    
+    yield events
+    
+    # Remaining pages, bounded by what the API reports
+    total_pages = response.get('page', {}).get('totalPages', 1)
+    remaining_pages = range(1, min(max_pages, total_pages))
+    if not remaining_pages:
+        return
+    
+    with ThreadPoolExecutor(max_workers=min(PAGE_FETCH_WORKERS, len(remaining_pages))) as executor:
+        futures = [executor.submit(get_events, page=page, **kwargs) for page in remaining_pages]
+        
+        for page, future in zip(remaining_pages, futures):
+            try:
+                events = future.result().get('_embedded', {}).get('events', [])
+            except Exception as e:
+                print(f"Error fetching page {page}: {e}")
+                events = None
+            
+            if not events:  # Error or no more events
+                for pending in futures:
+                    pending.cancel()
+                break
+            
+            yield events
+
+
 def get_events_all_pages(api_key: str, max_pages: int = 5, **kwargs) -> List[Dict[str, Any]]:
     """
     Get events from multiple pages (up to max_pages).
@@ -244,28 +371,8 @@ def get_events_all_pages(api_key: str, max_pages: int = 5, **kwargs) -> List[Dic
         List of all events from all pages
     """
     all_events = []
-    page = 0
-    
-    while page < max_pages:
-        try:
-            response = get_events(page=page, **kwargs)
-            events = response.get('_embedded', {}).get('events', [])
-            
-            if not events:  # No more events
-                break
-                
-            all_events.extend(events)
-            
-            # Check if we've reached the last page
-            page_info = response.get('page', {})
-            if page >= page_info.get('totalPages', 1) - 1:
-                break
-                
-            page += 1
-            
-        except Exception as e:
-            print(f"Error fetching page {page}: {e}")
-            break
+    for events in iter_event_pages(max_pages=max_pages, **kwargs):
+        all_events.extend(events)
     
     return all_events
 
@@ -347,12 +454,15 @@ def extract_classifications(event):
 
 def transform_event_simple(event):
     """Simple event transformation for basic endpoints"""
+    venue_info = extract_venue_info(event)
+    classification_info = extract_classifications(event)
+    start = event.get('dates', {}).get('start', {})
     return {
         'id': event.get('id'),
         'name': event.get('name'),
-        'date': event.get('dates', {}).get('start', {}).get('localDate'),
-        'time': event.get('dates', {}).get('start', {}).get('localTime'),
-        'venue_name': extract_venue_info(event).get('name') if extract_venue_info(event) else None,
-        'classification': extract_classifications(event).get('segment') if extract_classifications(event) else None,
+        'date': start.get('localDate'),
+        'time': start.get('localTime'),
+        'venue_name': venue_info['name'] if venue_info else None,
+        'classification': classification_info['segment'] if classification_info else None,
         'url': event.get('url')
     }
\ No newline at end of file
@@ -0,0 +1,11 @@
+import os
+
+# Gunicorn settings for the Railway container (picked up from the working directory)
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+timeout = 120
+
+# Keep client connections open between requests so repeat API calls skip the TCP/TLS setup
+keepalive = 5
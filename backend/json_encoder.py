@@ -1,15 +1,32 @@
 from flask.json.provider import DefaultJSONProvider
-import datetime
 import decimal
+import orjson
 
 class CustomJSONProvider(DefaultJSONProvider):
     def default(self, obj):
-        if isinstance(obj, datetime.datetime):
-            return obj.isoformat()
-        elif isinstance(obj, datetime.date):
-            return obj.isoformat()  
-        elif isinstance(obj, datetime.time):
-            return obj.isoformat()
-        elif isinstance(obj, decimal.Decimal):
+        """Fallback for types orjson can't encode itself (it handles datetime, date, time and dataclasses natively)"""
+        if isinstance(obj, decimal.Decimal):
             return float(obj)
-        return super().default(obj)
\ No newline at end of file
+        return super().default(obj)
+
+    def _orjson_option(self):
+        """orjson flags mirroring the provider's sort_keys setting"""
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps_bytes(self, obj):
+        """Serialize to UTF-8 JSON bytes, for bodies that are assembled or streamed by hand"""
+        return orjson.dumps(obj, default=self.default, option=self._orjson_option())
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Serialize straight to bytes, skipping the str round-trip of the default provider"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
@@ -0,0 +1,51 @@
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any
+import datetime as dt
+
+
+@dataclass(slots=True)
+class Venue:
+    """Venue block of an event as returned to the frontend"""
+    id: Optional[str]
+    name: Optional[str]
+    address: Optional[str]
+    city: Optional[str]
+    state: Optional[str]
+    country: Optional[str]
+    postal_code: Optional[str]
+    timezone: Optional[str]
+    location: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class Classifications:
+    """Primary classification of an event as returned to the frontend"""
+    segment: Optional[str]
+    genre: Optional[str]
+    subgenre: Optional[str]
+    type: Optional[str]
+    subtype: Optional[str]
+    family: bool = False
+
+
+@dataclass(slots=True)
+class Event:
+    """
+    Event in the shape the frontend expects.
+
+    Serialized field-by-field by orjson, so field order here is the key order of the JSON output.
+    """
+    id: Optional[str]
+    name: Optional[str]
+    url: Optional[str]
+    date: Optional[dt.date]
+    time: Optional[dt.time]
+    datetime: Optional[dt.datetime]
+    timezone: Optional[str]
+    status: Optional[str]
+    venue: Optional[Venue]
+    classifications: Optional[Classifications]
+    price_ranges: List[Dict[str, Any]] = field(default_factory=list)
+    images: List[Dict[str, Any]] = field(default_factory=list)
+    info: Optional[str] = None
+    please_note: Optional[str] = None
@@ -0,0 +1,48 @@
+from typing import Any, Optional, Sequence, Tuple
+from models import Event, Venue, Classifications
+
+# Fully annotated so the module can be compiled with mypyc (`mypyc transform.py`);
+# a compiled extension next to this file takes precedence on import.
+
+# Columns read by /api/events, in the order transform_db_event unpacks them
+EVENT_COLUMNS: Tuple[str, ...] = (
+    'id', 'name', 'url', 'date', 'time', 'datetime', 'timezone', 'status',
+    'venue_id', 'venue_name', 'venue_address', 'venue_city', 'venue_state',
+    'venue_country', 'venue_postal_code', 'venue_timezone', 'venue_location',
+    'classification_segment', 'classification_genre', 'classification_subgenre',
+    'classification_type', 'classification_subtype', 'classification_family',
+    'price_ranges', 'images', 'info', 'please_note'
+)
+
+
+def transform_db_event(row: Sequence[Any]) -> Event:
+    """Transform a database event row (columns in EVENT_COLUMNS order) into the frontend event format"""
+    # Unpack in EVENT_COLUMNS order: straight-line local loads, no per-column lookups
+    (event_id, name, url, date, time, event_datetime, event_timezone, status,
+     venue_id, venue_name, venue_address, venue_city, venue_state,
+     venue_country, venue_postal_code, venue_timezone, venue_location,
+     classification_segment, classification_genre, classification_subgenre,
+     classification_type, classification_subtype, classification_family,
+     price_ranges, images, info, please_note) = row
+    
+    # Reconstruct venue info object
+    venue_info: Optional[Venue] = None
+    if venue_name:
+        venue_info = Venue(
+            venue_id, venue_name, venue_address, venue_city, venue_state,
+            venue_country, venue_postal_code, venue_timezone, venue_location
+        )
+    
+    # Reconstruct classifications object
+    classifications_info: Optional[Classifications] = None
+    if classification_segment:
+        classifications_info = Classifications(
+            classification_segment, classification_genre, classification_subgenre,
+            classification_type, classification_subtype, bool(classification_family)
+        )
+    
+    # Build transformed event matching frontend expectations
+    return Event(
+        event_id, name, url, date, time, event_datetime, event_timezone, status,
+        venue_info, classifications_info, price_ranges, images, info, please_note
+    )
@@ -1,27 +1,141 @@
-import json
+import os
+import orjson
+import numpy as np
 import folium
-from datetime import datetime
+from datetime import date
+from functools import lru_cache
+from string import Template
+from itertools import chain, islice
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-def load_events_from_json(json_file_path):
+try:
+    import ijson  # optional: streams large dumps instead of parsing them whole
+except ImportError:
+    ijson = None
+
+# Dumps smaller than this are parsed in one go, streaming only pays off for larger files
+STREAM_PARSE_MIN_BYTES = 64 * 1024
+
+# Dumps with at least this many events are extracted in parallel, PARALLEL_CHUNK_SIZE events per task
+PARALLEL_MIN_EVENTS = 1000
+PARALLEL_CHUNK_SIZE = 500
+
+# English month names for format_event_date (same as strftime('%B') in the C locale)
+MONTH_NAMES = ('January', 'February', 'March', 'April', 'May', 'June', 'July',
+               'August', 'September', 'October', 'November', 'December')
+
+# Popup templates, parsed once instead of formatting an f-string per marker
+BASIC_POPUP = Template("""
+        <div style="width: 300px;">
+            <h4 style="color: #2E86C1; margin-bottom: 10px;">$name</h4>
+            <p><strong>📅 Date:</strong> $date</p>
+            <p><strong>📍 Venue:</strong> $venue</p>
+            <p><strong>🏙️ Location:</strong> $city, $country</p>
+            $url_block
+        </div>
+        """)
+BASIC_TICKETS_LINK = Template('<p><a href="$url" target="_blank">🎫 Buy Tickets</a></p>')
+
+ADVANCED_POPUP = Template("""
+        <div style="width: 320px; font-family: Arial, sans-serif;">
+            <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                        color: white; padding: 15px; margin: -10px -10px 10px -10px; 
+                        border-radius: 8px 8px 0 0;">
+                <h3 style="margin: 0; font-size: 18px;">$name</h3>
+            </div>
+            <div style="padding: 10px;">
+                <p style="margin: 8px 0;"><strong>📅 Date:</strong> <span style="color: #2E86C1;">$date</span></p>
+                <p style="margin: 8px 0;"><strong>📍 Venue:</strong> $venue</p>
+                <p style="margin: 8px 0;"><strong>🏙️ Location:</strong> $city, $country</p>
+                <p style="margin: 8px 0;"><strong>🌍 Coordinates:</strong> $coordinates</p>
+                $url_block
+            </div>
+        </div>
+        """)
+ADVANCED_TICKETS_LINK = Template('<div style="text-align: center; margin-top: 15px;"><a href="$url" target="_blank" style="background: #E74C3C; color: white; padding: 8px 16px; text-decoration: none; border-radius: 4px; font-weight: bold;">🎫 Buy Tickets</a></div>')
+
+# Marker icon of the basic map; folium needs a separate Icon per marker, the options are shared
+BASIC_ICON_OPTIONS = {'color': 'red', 'icon': 'music', 'prefix': 'fa'}
+
+# Client-side marker factory for FastMarkerCluster rows of [lat, lon, popup_html, tooltip]
+ADVANCED_MARKER_CALLBACK = """
+function (row) {
+    var icon = L.AwesomeMarkers.icon({icon: 'calendar', prefix: 'fa', markerColor: 'darkred'});
+    var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: icon});
+    marker.bindPopup(row[2], {maxWidth: 400});
+    marker.bindTooltip(row[3]);
+    return marker;
+};
+"""
+
+def iter_json_events(json_file_path):
     """
-    Load events data from JSON file and extract relevant information
+    Yield the raw events of a Ticketmaster JSON dump one at a time
     """
-    with open(json_file_path, 'r', encoding='utf-8') as file:
-        data = json.load(file)
+    if ijson is not None and os.path.getsize(json_file_path) >= STREAM_PARSE_MIN_BYTES:
+        with open(json_file_path, 'rb') as file:
+            yield from ijson.items(file, '_embedded.events.item')
+        return
     
-    events_list = []
+    with open(json_file_path, 'rb') as file:
+        data = orjson.loads(file.read())
     
     # Extract events from the JSON structure
     if '_embedded' in data and 'events' in data['_embedded']:
-        events = data['_embedded']['events']
-        
+        yield from data['_embedded']['events']
+
+def extract_events_chunk(events):
+    """
+    Extract relevant data from a list of events, dropping events without coordinates
+    """
+    return [event_info for event_info in map(extract_event_data, events) if event_info]
+
+def load_events_from_json(json_file_path, limit=None):
+    """
+    Load events data from JSON file and extract relevant information
+    
+    Stops reading once limit events with coordinates were found (if limit is given).
+    Large dumps are extracted in chunks across processes.
+    """
+    events = iter_json_events(json_file_path)
+    head = list(islice(events, PARALLEL_MIN_EVENTS))
+    events = chain(head, events)
+    
+    # Small dumps (and limited reads) don't amortize the process start-up and pickling cost
+    if limit is not None or len(head) < PARALLEL_MIN_EVENTS:
+        events_list = []
         for event in events:
             event_info = extract_event_data(event)
             if event_info:
                 events_list.append(event_info)
+                if limit is not None and len(events_list) >= limit:
+                    break
+        return events_list
+    
+    chunks = iter(lambda: list(islice(events, PARALLEL_CHUNK_SIZE)), [])
+    events_list = []
+    workers = os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # executor.map would submit (and so read) every chunk up front; keep only a
+        # bounded window of chunks in flight so the dump is still streamed
+        pending = deque(executor.submit(extract_events_chunk, chunk) for chunk in islice(chunks, 2 * workers))
+        while pending:
+            events_list.extend(pending.popleft().result())
+            for chunk in islice(chunks, 1):
+                pending.append(executor.submit(extract_events_chunk, chunk))
     
     return events_list
 
+@lru_cache(maxsize=4096)
+def format_event_date(local_date):
+    """
+    Format a YYYY-MM-DD date as e.g. 'March 05, 2025' (many events share a date, so results are cached)
+    """
+    year, month, day = (int(part) for part in local_date.split('-'))
+    date(year, month, day)  # Raises ValueError for impossible dates, like strptime did
+    return f"{MONTH_NAMES[month - 1]} {day:02d}, {year}"
+
 def extract_event_data(event):
     """
     Extract relevant data from a single event
@@ -36,8 +150,7 @@ def extract_event_data(event):
             local_date = event['dates']['start'].get('localDate', 'TBD')
             if local_date != 'TBD':
                 # Format the date nicely
-                date_obj = datetime.strptime(local_date, '%Y-%m-%d')
-                event_date = date_obj.strftime('%B %d, %Y')
+                event_date = format_event_date(local_date)
         
         # Get venue information and coordinates
         venue_name = 'Unknown Venue'
@@ -80,6 +193,22 @@ def extract_event_data(event):
         print(f"Error processing event: {e}")
         return None
 
+def event_coordinates(events_list):
+    """
+    Latitudes and longitudes of the events as two numpy arrays
+    """
+    count = len(events_list)
+    lats = np.fromiter((event['latitude'] for event in events_list), dtype=np.float64, count=count)
+    lons = np.fromiter((event['longitude'] for event in events_list), dtype=np.float64, count=count)
+    return lats, lons
+
+def events_center(events_list):
+    """
+    Mean position of the events as [latitude, longitude]
+    """
+    lats, lons = event_coordinates(events_list)
+    return [float(lats.mean()), float(lons.mean())]
+
 def create_events_map(events_list, map_center=None):
     """
     Create interactive Folium map with event markers
@@ -90,9 +219,7 @@ def create_events_map(events_list, map_center=None):
     
     # Calculate map center if not provided
     if map_center is None:
-        avg_lat = sum(event['latitude'] for event in events_list) / len(events_list)
-        avg_lon = sum(event['longitude'] for event in events_list) / len(events_list)
-        map_center = [avg_lat, avg_lon]
+        map_center = events_center(events_list)
     
     # Create the map
     event_map = folium.Map(
@@ -104,26 +231,17 @@ def create_events_map(events_list, map_center=None):
     # Add markers for each event
     for event in events_list:
         # Create popup content with HTML formatting
-        popup_html = f"""
-        <div style="width: 300px;">
-            <h4 style="color: #2E86C1; margin-bottom: 10px;">{event['name']}</h4>
-            <p><strong>📅 Date:</strong> {event['date']}</p>
-            <p><strong>📍 Venue:</strong> {event['venue']}</p>
-            <p><strong>🏙️ Location:</strong> {event['city']}, {event['country']}</p>
-            {f'<p><a href="{event["url"]}" target="_blank">🎫 Buy Tickets</a></p>' if event['url'] else ''}
-        </div>
-        """
+        popup_html = BASIC_POPUP.substitute(
+            event,
+            url_block=BASIC_TICKETS_LINK.substitute(url=event['url']) if event['url'] else ''
+        )
         
         # Create marker
         folium.Marker(
             location=[event['latitude'], event['longitude']],
             popup=folium.Popup(popup_html, max_width=350),
             tooltip=f"{event['name']} - {event['date']}",
-            icon=folium.Icon(
-                color='red',
-                icon='music',
-                prefix='fa'
-            )
+            icon=folium.Icon(**BASIC_ICON_OPTIONS)
         ).add_to(event_map)
     
     return event_map
@@ -136,12 +254,11 @@ def create_advanced_events_map(events_list):
         return None
     
     # Calculate map center
-    avg_lat = sum(event['latitude'] for event in events_list) / len(events_list)
-    avg_lon = sum(event['longitude'] for event in events_list) / len(events_list)
+    map_center = events_center(events_list)
     
     # Create map with custom styling
     event_map = folium.Map(
-        location=[avg_lat, avg_lon],
+        location=map_center,
         zoom_start=8,
         tiles=None
     )
@@ -167,40 +284,24 @@ def create_advanced_events_map(events_list):
     # folium.TileLayer('CartoDB positron').add_to(event_map)
     # folium.TileLayer('CartoDB dark_matter').add_to(event_map)
     
-    # Create marker cluster for better performance with many events
+    # Create marker cluster for better performance with many events; marker data is
+    # emitted as one JS array and the markers are built client-side by the callback
     from folium import plugins
-    marker_cluster = plugins.MarkerCluster().add_to(event_map)
-    
-    # Add markers to cluster
-    for i, event in enumerate(events_list):
-        # Enhanced popup with more styling
-        popup_html = f"""
-        <div style="width: 320px; font-family: Arial, sans-serif;">
-            <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                        color: white; padding: 15px; margin: -10px -10px 10px -10px; 
-                        border-radius: 8px 8px 0 0;">
-                <h3 style="margin: 0; font-size: 18px;">{event['name']}</h3>
-            </div>
-            <div style="padding: 10px;">
-                <p style="margin: 8px 0;"><strong>📅 Date:</strong> <span style="color: #2E86C1;">{event['date']}</span></p>
-                <p style="margin: 8px 0;"><strong>📍 Venue:</strong> {event['venue']}</p>
-                <p style="margin: 8px 0;"><strong>🏙️ Location:</strong> {event['city']}, {event['country']}</p>
-                <p style="margin: 8px 0;"><strong>🌍 Coordinates:</strong> {event['latitude']:.4f}, {event['longitude']:.4f}</p>
-                {f'<div style="text-align: center; margin-top: 15px;"><a href="{event["url"]}" target="_blank" style="background: #E74C3C; color: white; padding: 8px 16px; text-decoration: none; border-radius: 4px; font-weight: bold;">🎫 Buy Tickets</a></div>' if event['url'] else ''}
-            </div>
-        </div>
-        """
-        
-        folium.Marker(
-            location=[event['latitude'], event['longitude']],
-            popup=folium.Popup(popup_html, max_width=400),
-            tooltip=f"Click for details: {event['name']}",
-            icon=folium.Icon(
-                color='darkred',
-                icon='calendar',
-                prefix='fa'
-            )
-        ).add_to(marker_cluster)
+    marker_data = [
+        [
+            event['latitude'],
+            event['longitude'],
+            # Enhanced popup with more styling
+            ADVANCED_POPUP.substitute(
+                event,
+                coordinates=f"{event['latitude']:.4f}, {event['longitude']:.4f}",
+                url_block=ADVANCED_TICKETS_LINK.substitute(url=event['url']) if event['url'] else ''
+            ),
+            f"Click for details: {event['name']}"
+        ]
+        for event in events_list
+    ]
+    plugins.FastMarkerCluster(data=marker_data, callback=ADVANCED_MARKER_CALLBACK).add_to(event_map)
     
     # Add layer control
     folium.LayerControl().add_to(event_map)